@@ -3,22 +3,29 @@
 Multi-Agent Travel Planner
 
 Highlights:
-- Clear separation of concerns (tools, agents, orchestration, UI)
-- Simple global logger to display tool calls live in the sidebar
-- Planner → Reviewer pipeline enforced before rendering any answer
+- Clear separation of concerns: tools + agents (travel_agents.py), tool logging
+  (tool_logging.py), orchestration and UI (this file)
+- Request-local (contextvar) logger to display tool calls live in the sidebar
+- Planner → Reviewer pipeline enforced before rendering any answer, in one event loop
+- Repeated prompts are answered from a prompt cache (see llm_cache.py)
 - Minimal dependencies and straightforward control flow
 """
 
 from __future__ import annotations
 
 import os
+import re
+import json
 import asyncio
 import time
-from typing import Callable, Dict, List, Optional, Any
+from contextvars import copy_context
+from typing import Callable, Dict, List, NamedTuple, Optional, Any
 
 import streamlit as st
 from dotenv import load_dotenv
-from tavily import TavilyClient
+
+import llm_cache
+from tool_logging import set_tool_logger
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Environment & Globals
@@ -28,210 +35,13 @@ load_dotenv()  # Loads variables from a local .env if present
 os.environ.setdefault("OPENAI_LOG", "error")
 os.environ.setdefault("OPENAI_TRACING", "false")
 
-# Tool call logger: the UI sets this per request. The tool checks it and logs.
-# Using a simple global makes this easy to teach and reason about.
-TOOL_LOGGER: Optional[Callable[[Dict[str, Any]], None]] = None
-
-
-def set_tool_logger(logger: Optional[Callable[[Dict[str, Any]], None]]) -> None:
-    """Install or remove the UI logger used by tools to report activity."""
-    global TOOL_LOGGER
-    TOOL_LOGGER = logger
-
-
-def log_tool_event(event: Dict[str, Any]) -> None:
-    """If a logger is installed, send the event to the UI."""
-    if TOOL_LOGGER is not None:
-        try:
-            TOOL_LOGGER(event)
-        except Exception:
-            # Logging should never break the app or the tool itself
-            pass
-
-
-def redact_for_logs(value: Any) -> Any:
-    """
-    Make sure we don't leak secrets and keep logs small.
-    This is deliberately simple for teaching.
-    """
-    if isinstance(value, str):
-        low = value.lower()
-        if any(k in low for k in ("api_key", "token", "secret", "password")):
-            return "[redacted]"
-        return value if len(value) <= 300 else value[:120] + "… [truncated]"
-    if isinstance(value, dict):
-        return {k: ("[redacted]" if any(s in k.lower() for s in ("key", "token", "secret", "password"))
-                    else redact_for_logs(v))
-                for k, v in value.items()}
-    if isinstance(value, list):
-        return [redact_for_logs(v) for v in value]
-    return value
-
-
 # ──────────────────────────────────────────────────────────────────────────────
 # Agent Framework Imports (provided by you)
 # ──────────────────────────────────────────────────────────────────────────────
 # These come from your own framework. We assume:
-# - Agent: defines a model + instructions + optional tools
 # - Runner.run(agent, input): executes an agent and returns an object with text
-from agents import Agent, Runner, function_tool  # type: ignore
-
-
-# ──────────────────────────────────────────────────────────────────────────────
-# Tools
-# ──────────────────────────────────────────────────────────────────────────────
-
-@function_tool
-def internet_search(query: str) -> str:
-    """
-    Internet search backed by Tavily.
-    - Reads TAVILY_API_KEY from environment.
-    - Sends simple log events before/after the call so the UI can show activity.
-    """
-    log_tool_event({"type": "call", "tool": "internet_search", "args": {"query": redact_for_logs(query)}})
-
-    try:
-        # Reload environment variables to ensure they're available
-        load_dotenv(override=True)
-        api_key = os.getenv("TAVILY_API_KEY")
-        
-        if not api_key:
-            msg = "missing TAVILY_API_KEY in environment."
-            log_tool_event({"type": "error", "tool": "internet_search", "error": msg})
-            return f"Search error: {msg}"
-
-        # Initialize client with explicit API key
-        client = TavilyClient(api_key=api_key)
-        response = client.search(query, max_results=3)
-
-        items = response.get("results", [])
-        lines = [f"- {it.get('title', 'N/A')}: {it.get('content', 'N/A')}" for it in items]
-        output = "\n".join(lines) if lines else "No results found."
-
-        log_tool_event({
-            "type": "result",
-            "tool": "internet_search",
-            "preview": redact_for_logs(output[:400] + ("…" if len(output) > 400 else "")),
-        })
-        return output
-
-    except Exception as e:
-        error_msg = str(e)
-        log_tool_event({"type": "error", "tool": "internet_search", "error": error_msg})
-        # Provide more helpful error message
-        if "API key" in error_msg or "Unauthorized" in error_msg:
-            return f"Search error: Invalid Tavily API key. Please check your TAVILY_API_KEY in the .env file. Error: {error_msg}"
-        return f"Search error: {error_msg}"
-
-    finally:
-        log_tool_event({"type": "end", "tool": "internet_search"})
-
-
-# ──────────────────────────────────────────────────────────────────────────────
-# Agents
-# ──────────────────────────────────────────────────────────────────────────────
-
-# BEGIN SOLUTION
-REVIEWER_INSTRUCTIONS = """
-You are a Travel Plan Reviewer Agent. Your role is to review and validate travel itineraries created by a Planner Agent before they are shown to the user.
-
-Your primary responsibilities:
-1. Feasibility Check: Verify that activities are realistic and feasible
-   - Check opening hours of museums, attractions, restaurants
-   - Verify ticket prices and availability
-   - Validate travel times between locations
-   - Ensure activities can actually be completed in the allocated time
-
-2. Identify Issues: Find unrealistic or conflicting activities
-   - Activities scheduled during closed hours
-   - Unrealistic travel times or distances
-   - Budget overruns or incorrect price estimates
-   - Conflicting activities (e.g., two places at the same time)
-   - Missing essential information (transportation, meals, etc.)
-
-3. Use Internet Search: Use the internet_search tool for real-time fact-checking
-   - Verify current ticket prices and availability
-   - Check opening hours and days of operation
-   - Validate travel times and distances between locations
-   - Confirm current information about attractions, restaurants, etc.
-
-4. Create Delta List: For any issues found, create a "Delta List" with:
-   - Specific changes needed (what to change)
-   - Clear reasons for each change (why it's needed)
-   - Concrete fixes or corrections
-
-Your output format:
-1. Delta List (if issues found):
-   - List each issue as: "[Issue]: [Reason] → [Fix]"
-   - Be specific and actionable
-   - Example: "Louvre visit at 8 PM: Museum closes at 6 PM → Move to 2 PM"
-
-2. Validated Itinerary:
-   - If issues were found, provide the corrected itinerary else confirm the plan is valid
-   - Maintain the same clear, structured format as the original
-   - Include brief notes on what was verified via internet search
-
-Be thorough and use internet search liberally to ensure accuracy. Your goal is to catch errors before the user sees the plan.
-"""
-
-PLANNER_INSTRUCTIONS = """
-You are a Travel Planner Agent. Your role is to transform a user's travel prompt into a detailed, day-by-day itinerary.
-
-Your task:
-Take a vague travel prompt (e.g., "Plan a week-long Europe trip for a student on a $1,500 budget who loves history and food, traveling with a friend who enjoys art and nightlife") and expand it into a comprehensive travel plan that considers all travelers' interests.
-
-Requirements for your itinerary:
-
-1. Day-by-Day Structure: 
-   - Organize activities by day
-   - Include approximate times for each activity
-   - Specify locations clearly
-
-2. Essential Components:
-   - Day-by-day activities with approximate times and locations
-   - Estimated costs for each major expense (accommodations, activities, meals, transportation)
-   - City clusters (group activities by geographic proximity)
-   - Logistics (transportation between cities/locations, check-in/check-out times)
-
-3. User Constraints:
-   - Respect the stated budget (break down costs and ensure total stays within budget)
-   - Honor specific dates or duration mentioned
-   - Incorporate user interests: Identify and include activities that match the user's stated interests (e.g., history, food, art, nature, adventure, shopping, nightlife)
-   - Consider companions' interests: If the user mentions traveling with companions (family, friends, partner, children, etc.), identify their interests and preferences, and create a balanced itinerary that accommodates both the user's and companions' interests
-   - Balance activities to ensure everyone in the travel group has engaging experiences
-   - Match the pacing preference (relaxed, moderate, or fast-paced)
-
-4. Format:
-   - Present the plan in a clear, structured format that's easy to read
-   - Use headings, bullet points, and clear sections
-   - Include a summary with total estimated costs
-   - Make it visually organized and scannable
-
-Important constraints:
-- No internet acces*: You work entirely from your own knowledge
-- Be realistic with time estimates and travel logistics
-- Consider practical factors like meal times, rest, and travel between locations
-- Provide a balanced mix of activities that match both the user's and any companions' interests
-- When companions are mentioned, ensure the itinerary includes activities that appeal to different interests within the group
-- If interests conflict, find creative ways to balance them (e.g., morning activity for one interest, afternoon for another, or activities that combine multiple interests)
-
-Your output should be a complete, ready-to-use travel itinerary that a user could follow.
-"""
-
-reviewer_agent = Agent(
-    name="Reviewer Agent",
-    model="openai.gpt-4o",
-    instructions=REVIEWER_INSTRUCTIONS.strip(),
-    tools=[internet_search]
-)
-
-planner_agent = Agent(
-    name="Planner Agent",
-    model="openai.gpt-4o",
-    instructions=PLANNER_INSTRUCTIONS.strip(),
-)
-
-# END SOLUTION
+from agents import Runner  # type: ignore
+from travel_agents import planner_agent, reviewer_agent, search_session  # tools + agents, built once
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -250,32 +60,130 @@ def extract_text(result_obj: Any) -> str:
     )
 
 
-def run_planner(user_text: str) -> str:
-    """Run the Planner and return its itinerary text."""
-    result = asyncio.run(Runner.run(planner_agent, user_text))
+# Checkable claims: prices in any common currency ("$40", "€21", "1,500 yen"),
+# clock times ("9:30", "8 PM") and durations ("45 min", "2 hours"). A plan without
+# any gives the Reviewer nothing to search for, so the review round-trip is skipped.
+_CLAIM_RE = re.compile(
+    r"[$€£¥]\s?\d"
+    r"|\d\s?(?:[€£¥]|(?:USD|EUR|GBP|JPY|CHF|yen|euros?|dollars?|pounds?)\b)"
+    r"|\b(?:USD|EUR|GBP|JPY|CHF)\s?\d"
+    r"|\d{1,2}:\d{2}"
+    r"|\b\d{1,2}\s?(?:AM|PM)\b"
+    r"|\b\d+(?:\.\d+)?\s?(?:-\s?\d+\s?)?(?:min(?:ute)?s?|h(?:ou)?rs?|hours?|h)\b",
+    re.I,
+)
+
+
+def _needs_review(plan_text: str) -> bool:
+    """True if the plan states any price, time or duration worth fact-checking."""
+    return bool(_CLAIM_RE.search(plan_text))
+
+
+# Plans this long are condensed before review (roughly 1,500 tokens). The Reviewer
+# then only fact-checks and returns a Delta List; the full plan stays the answer.
+REVIEW_COMPRESS_MIN_CHARS = 6000
+_HEADING_RE = re.compile(r"^(?:#{1,6}\s+.*|\*\*[^*]+\*\*:?|Day\s+\d+\b.*)$", re.I)
+_DAY_RE = re.compile(r"\bDay\s+\d+", re.I)
+
+
+def compress_for_review(plan_text: str) -> str:
+    """
+    Shrink a long plan to what the Reviewer can actually fact-check:
+    lines with prices, times or durations, grouped under their nearest heading
+    and serialized as JSON {section: [claims]} behind a one-line summary.
+    """
+    claims: Dict[str, List[str]] = {}
+    day, sub = "", ""  # e.g. "Day 2: Rome" / "Evening"
+    lines = plan_text.splitlines()
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if _HEADING_RE.match(stripped):
+            title = stripped.strip("#* ").rstrip(":")
+            if _DAY_RE.search(title):
+                day, sub = title, ""
+            else:
+                sub = title
+        if _CLAIM_RE.search(stripped):
+            section = " / ".join(p for p in (day, sub) if p) or "Overview"
+            claims.setdefault(section, []).append(stripped.lstrip("-*•# ").strip())
+
+    kept = sum(len(v) for v in claims.values())
+    summary = (f"Condensed itinerary for review: {kept} of {len(lines)} lines "
+               f"(those with prices, times or durations), grouped by section.")
+    return summary + "\n" + json.dumps(claims, ensure_ascii=False)
+
+
+@llm_cache.cached_run(planner_agent)
+async def run_planner(
+    user_text: str,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Run the Planner and return its itinerary text.
+    The run is streamed: `on_delta` receives the text so far, at most every 50ms.
+    """
+    result = Runner.run_streamed(planner_agent, user_text)
+    buffer: List[str] = []
+    last_push = 0.0
+    async for event in result.stream_events():
+        data = getattr(event, "data", None)
+        if getattr(data, "type", None) != "response.output_text.delta":
+            continue
+        buffer.append(data.delta)
+        if on_delta is not None and time.monotonic() - last_push >= 0.05:
+            on_delta("".join(buffer))
+            last_push = time.monotonic()
     return extract_text(result)
 
 
-def run_reviewer(plan_text: str) -> str:
+@llm_cache.cached_run(reviewer_agent)
+async def run_reviewer(plan_text: str) -> str:
     """Run the Reviewer on the planner’s output and return validated text."""
-    result = asyncio.run(Runner.run(reviewer_agent, plan_text))
+    result = await Runner.run(reviewer_agent, plan_text)
     return extract_text(result)
 
 
+class PipelineResult(NamedTuple):
+    """Everything the UI needs to render one turn."""
+    plan_text: str
+    review_text: Optional[str]  # None when the review was skipped
+    reviewed: bool              # False: the plan had nothing to fact-check
+    condensed: bool = False     # True: review_text is only a Delta List for plan_text
+
+
+async def pipeline(
+    user_text: str,
+    on_planned: Optional[Callable[[str], None]] = None,
+    on_plan_delta: Optional[Callable[[str], None]] = None,
+) -> PipelineResult:
+    """
+    Planner → Reviewer inside a single event loop.
+    `on_plan_delta` receives the partial plan while the Planner streams;
+    `on_planned` is called between the two agents, only if a review will run.
+    """
+    plan_text = await run_planner(user_text, on_delta=on_plan_delta)
+    if not _needs_review(plan_text):
+        return PipelineResult(plan_text, None, reviewed=False)
+    if on_planned is not None:
+        on_planned(plan_text)
+    condensed = len(plan_text) >= REVIEW_COMPRESS_MIN_CHARS
+    review_input = compress_for_review(plan_text) if condensed else plan_text
+    # The Reviewer's searches share one pooled HTTP client for this run
+    async with search_session():
+        review_text = await run_reviewer(review_input)
+    return PipelineResult(plan_text, review_text, reviewed=True, condensed=condensed)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Streamlit UI
 # ──────────────────────────────────────────────────────────────────────────────
 
-st.set_page_config(
-    page_title="Travel Planner", 
-    page_icon="✈️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS for better styling
-st.markdown("""
-    <style>
+# Static page content, kept out of the layout code.
+# Streamlit drops any element a rerun does not emit again, so these are still
+# sent on every run; the CSS is whitespace-collapsed to keep that payload small.
+_CSS = "<style>" + " ".join("""
     .main-header {
         background: linear-gradient(90deg, #1f77b4 0%, #ff7f0e 100%);
         padding: 1rem;
@@ -314,8 +222,42 @@ st.markdown("""
         color: #374151;
         line-height: 1.6;
     }
-    </style>
-""", unsafe_allow_html=True)
+""".split()) + "</style>"
+
+WELCOME_MD = """
+👋 **Welcome to the Multi-Agent Travel Planner!**
+
+I can help you create detailed, validated travel itineraries. Just describe:
+- Your destination(s)
+- Duration of trip
+- Budget
+- Your interests (history, food, art, nature, etc.)
+
+The Planner Agent will create a day-by-day itinerary, and the Reviewer Agent will validate it with real-time fact-checking to ensure accuracy!
+""".strip()
+
+EXAMPLE_PROMPTS = [
+    "Plan a week-long Europe trip for a student on a $1,500 budget who loves history and food",
+    "3-day Paris trip for art lovers with $800 budget",
+    "5-day Tokyo itinerary for food enthusiasts, budget $2,000",
+    "Weekend getaway to New York City, $500 budget, interested in museums and Broadway"
+]
+
+ABOUT_MD = """
+This app uses two AI agents:
+- **Planner**: Creates detailed itineraries
+- **Reviewer**: Validates with internet search
+""".strip()
+
+st.set_page_config(
+    page_title="Travel Planner", 
+    page_icon="✈️",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS for better styling (sent on every rerun, so keep it compact)
+st.markdown(_CSS, unsafe_allow_html=True)
 
 st.title("✈️ Multi-Agent Travel Planner")
 st.markdown("**Transform your travel ideas into validated, day-by-day itineraries**")
@@ -331,14 +273,7 @@ with st.sidebar:
     st.divider()
     
     st.subheader("💡 Example Prompts")
-    example_prompts = [
-        "Plan a week-long Europe trip for a student on a $1,500 budget who loves history and food",
-        "3-day Paris trip for art lovers with $800 budget",
-        "5-day Tokyo itinerary for food enthusiasts, budget $2,000",
-        "Weekend getaway to New York City, $500 budget, interested in museums and Broadway"
-    ]
-    
-    for i, prompt in enumerate(example_prompts):
+    for i, prompt in enumerate(EXAMPLE_PROMPTS):
         if st.button(f"📌 Example {i+1}", key=f"example_{i}", use_container_width=True):
             st.session_state.example_prompt = prompt
     
@@ -351,39 +286,90 @@ with st.sidebar:
         tool_panel = tool_expander.container()
     else:
         tool_panel = st.container()  # inert sink
+    cache_stats_slot = st.empty()  # redrawn after each request, see show_cache_stats
+
+    def show_cache_stats() -> None:
+        """Draw the prompt-cache hit/miss counters."""
+        cache_stats_slot.caption(
+            f"LLM cache: {llm_cache.STATS['hits']} hits · {llm_cache.STATS['misses']} misses")
+
+    show_cache_stats()
     
     st.divider()
     st.markdown("**About**")
-    st.info("""
-    This app uses two AI agents:
-    - **Planner**: Creates detailed itineraries
-    - **Reviewer**: Validates with internet search
-    """)
+    st.info(ABOUT_MD)
 
 # Helper function to parse Delta List and Itinerary from reviewer output
+# Section headers as the Reviewer writes them, e.g. "2. **Validated Itinerary**"
+_VALIDATED_RE = re.compile(r"(?:\d\.\s*)?\*\*Validated Itinerary\*\*")
+_DELTA_HEADER_RE = re.compile(r"(?:\d\.\s*)?(?:\*\*)?Delta List(?:\*\*)?")
+
+@st.cache_data(max_entries=128, show_spinner=False)
 def parse_reviewer_output(review_text: str) -> tuple[Optional[str], str]:
     """
     Parse the reviewer output to extract Delta List and Validated Itinerary.
     Returns (delta_list, validated_itinerary)
     """
-    delta_list = None
-    validated_itinerary = review_text
-    
-    # Look for Delta List section
-    if "**Delta List**" in review_text or "Delta List" in review_text:
-        # Try to extract delta list
-        parts = review_text.split("**Validated Itinerary**")
-        if len(parts) > 1:
-            delta_list = parts[0].replace("**Delta List**", "").replace("Delta List", "").strip()
-            validated_itinerary = parts[1].strip()
-        else:
-            # Alternative format: look for "Delta List" followed by itinerary
-            parts = review_text.split("2. **Validated Itinerary**")
-            if len(parts) > 1:
-                delta_list = parts[0].replace("1. **Delta List**", "").replace("**Delta List**", "").strip()
-                validated_itinerary = parts[1].strip()
-    
-    return delta_list, validated_itinerary
+    if "Delta List" not in review_text:
+        return None, review_text
+
+    # One split on the itinerary header: everything before it is the Delta List
+    parts = _VALIDATED_RE.split(review_text, maxsplit=1)
+    if len(parts) == 1:
+        return None, review_text
+
+    delta_list = _DELTA_HEADER_RE.sub("", parts[0]).strip()
+    return delta_list, parts[1].strip()
+
+# Helper function to read a condensed review (the Reviewer returns only a Delta List)
+# Whole header line in any style: "### Delta List", "**Delta List:**", "1. Delta List:" …
+_DELTA_LINE_RE = re.compile(r"^[#*\s\d.]*Delta List[:*\s]*", re.I | re.M)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def parse_condensed_review(review_text: str) -> Optional[str]:
+    """
+    Extract the Delta List from a condensed review.
+    Returns None when the Reviewer found no issues.
+    """
+    # Ignore an itinerary section, should the Reviewer add one anyway
+    text = _VALIDATED_RE.split(review_text, maxsplit=1)[0]
+    delta_list = _DELTA_LINE_RE.sub("", text, count=1).strip()
+    if not delta_list or delta_list.lstrip("-*_ ").lower().startswith("no issues"):
+        return None
+    return delta_list
+
+# Helper function to turn one tool event into a markdown line for the sidebar log
+def format_tool_event(ev: Dict[str, Any]) -> str:
+    """Render a tool event once, so the log can be redrawn by joining strings."""
+    t = ev.get("tool", "unknown")
+    et = ev.get("type", "event")
+    if et == "call":
+        return f"- **{t}** called with `{ev.get('args')}`"
+    if et == "result":
+        preview = str(ev.get("preview", "")).replace("\n", "\n  > ")
+        label = "cached result" if ev.get("cached") else "result"
+        return f"- **{t}** {label} preview:\n\n  > {preview}"
+    if et == "error":
+        return f"- ⚠️ **{t}** error: {ev.get('error')}"
+    if et == "end":
+        return f"- **{t}** finished"
+    return f"- **{t}** {et}"
+
+# Helper function to build the styled reviewer answer once per turn
+def build_itinerary_html(
+    delta_list: Optional[str],
+    validated_itinerary: str,
+    heading: str = "### ✅ Validated Itinerary",
+) -> str:
+    """Delta List (if any) + the itinerary under `heading` as one markdown/HTML string."""
+    parts = []
+    if delta_list:
+        parts.append("### 🔍 Changes Made (Delta List)")
+        parts.append(f'<div class="delta-list">{delta_list}</div>')
+        parts.append("---")
+    parts.append(heading)
+    parts.append(f'<div class="validated-itinerary">{validated_itinerary}</div>')
+    return "\n\n".join(parts)
 
 # Session state for chat history
 if "messages" not in st.session_state:
@@ -392,40 +378,45 @@ if "messages" not in st.session_state:
     
     # Show welcome message for first-time users
     with st.chat_message("assistant"):
-        st.markdown("""
-        👋 **Welcome to the Multi-Agent Travel Planner!**
-        
-        I can help you create detailed, validated travel itineraries. Just describe:
-        - Your destination(s)
-        - Duration of trip
-        - Budget
-        - Your interests (history, food, art, nature, etc.)
-        
-        The Planner Agent will create a day-by-day itinerary, and the Reviewer Agent will validate it with real-time fact-checking to ensure accuracy!
-        """)
-
-# Render history
-for i, msg in enumerate(st.session_state.messages):
-    with st.chat_message(msg["role"]):
-        # Check if this is a reviewer output with delta list
-        if msg["role"] == "assistant" and "delta_list" in msg:
-            delta_list = msg.get("delta_list")
-            validated_itinerary = msg.get("content", "")
-            
-            if delta_list:
-                st.markdown("### 🔍 Changes Made (Delta List)")
-                st.markdown(f'<div class="delta-list">{delta_list}</div>', unsafe_allow_html=True)
-                st.divider()
-            
-            st.markdown("### ✅ Validated Itinerary")
-            st.markdown(f'<div class="validated-itinerary">{validated_itinerary}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(msg["content"])
-        
-        if msg["role"] == "assistant" and i < len(st.session_state.meta):
-            meta = st.session_state.meta[i]
-            if meta:
-                st.caption(meta.get("trace", ""))
+        st.markdown(WELCOME_MD)
+
+# Render history (a fragment, so it can refresh without rerunning the whole script).
+# Reviewer answers carry their prebuilt HTML in msg["_html"]: one markdown call per turn.
+@st.fragment
+def render_history() -> None:
+    """Draw every past turn of the conversation."""
+    for i, msg in enumerate(st.session_state.messages):
+        with st.chat_message(msg["role"]):
+            if "_html" in msg:
+                st.markdown(msg["_html"], unsafe_allow_html=True)
+            else:
+                st.markdown(msg["content"])
+
+            if msg["role"] == "assistant" and i < len(st.session_state.meta):
+                meta = st.session_state.meta[i]
+                if meta:
+                    st.caption(meta.get("trace", ""))
+
+render_history()
+
+# Raw Planner / Reviewer text for the latest turn. Long itineraries make this the
+# biggest payload on the page, so it is only sent once the user switches it on;
+# the toggle lives in a fragment, so flipping it reruns just this block.
+@st.fragment
+def render_full_outputs() -> None:
+    """Show the original plan and full reviewer output (if reviewed) on demand."""
+    last = st.session_state.get("_last_plan")
+    if not last:
+        return
+    reviewed = last["review"] is not None
+    label = "📋 Show original plan and full reviewer output" if reviewed else "📋 Show original plan"
+    if st.toggle(label, key="_show_full"):
+        st.markdown("#### Original Plan from Planner Agent")
+        st.markdown(last["plan"])
+        if reviewed:
+            st.divider()
+            st.markdown("#### Full Reviewer Output")
+            st.markdown(last["review"])
 
 # Handle example prompt from sidebar
 user_input = None
@@ -446,96 +437,104 @@ if user_input:
 
     # Assistant output block
     with st.chat_message("assistant"):
-        # Live “working…” text and progress bar
-        live_msg = st.empty()
-        progress = st.progress(0)
+        # One live slot for the phase line, progress bar and streamed Planner draft
+        status_slot = st.empty()
+
+        def show_phase(label: str, draft: str = "") -> None:
+            """Redraw the live slot: phase line, then the plan draft if any."""
+            status_slot.markdown(label + (f"\n\n---\n\n{draft}" if draft else ""))
 
-        # Per-request tool log (shown in the sidebar)
-        tool_events: List[Dict[str, Any]] = []
+        # Per-request tool log (shown in the sidebar). Events are formatted once and
+        # the single log slot is redrawn at most every 100ms, plus once at the end.
+        log_slot = tool_panel.empty()
+        tool_lines: List[str] = []
+        log_state = {"last_flush": 0.0}
+
+        def flush_tool_log() -> None:
+            """Redraw the sidebar log from the last N formatted events."""
+            if tool_lines:
+                log_slot.markdown("**Recent tool calls**\n\n" + "\n".join(tool_lines[-60:]))
+            log_state["last_flush"] = time.monotonic()
 
         def ui_tool_logger(event: Dict[str, Any]) -> None:
-            """Append an event and re-render the sidebar log."""
-            tool_events.append(event)
-            with tool_panel:
-                st.markdown("**Recent tool calls**")
-                for ev in tool_events[-60:]:  # last N entries
-                    t = ev.get("tool", "unknown")
-                    et = ev.get("type", "event")
-                    if et == "call":
-                        st.write(f"• **{t}** called with `{ev.get('args')}`")
-                    elif et == "result":
-                        st.write(f"• **{t}** result preview:\n\n> {ev.get('preview')}")
-                    elif et == "error":
-                        st.error(f"• **{t}** error: {ev.get('error')}")
-                    elif et == "end":
-                        st.write(f"• **{t}** finished")
-
-        # Install the logger so tools can report to the sidebar
-        set_tool_logger(ui_tool_logger)
+            """Append an event and re-render the sidebar log if the last flush is stale."""
+            tool_lines.append(format_tool_event(event))
+            if time.monotonic() - log_state["last_flush"] >= 0.1:
+                flush_tool_log()
+
+        # Install the logger in a private context so tools report to this request only
+        ctx = copy_context()
+        ctx.run(set_tool_logger, ui_tool_logger)
 
         try:
-            # Optional: clear sidebar panel on each run
-            with tool_panel:
-                st.empty()
-
-            # Step 1: Planner
-            with st.status("🧭 Planner Agent: generating itinerary…", expanded=True) as status:
-                live_msg.markdown("🧭 Planner Agent is creating your itinerary…")
-                plan_text = run_planner(user_input)
-                progress.progress(40)
-                status.update(label="🔎 Reviewer Agent: validating with live searches…", state="running")
-
-            # Step 2: Reviewer (tool calls will appear live in sidebar)
-            live_msg.markdown("🔎 Reviewer Agent is validating the plan with live searches…")
-            review_text = run_reviewer(plan_text)
-            progress.progress(90)
-
-            # Completed
-            live_msg.markdown("✅ Validation complete. Rendering results…")
-            time.sleep(0.2)
-            progress.progress(100)
-
-            # Parse reviewer output to extract Delta List and Validated Itinerary
-            delta_list, validated_itinerary = parse_reviewer_output(review_text)
+            # Step 1: Planner (its draft streams in below the phase line)
+            planning = "🧭 **Planner Agent** is creating your itinerary… `▓▓░░░░░░░░` 20%"
+            show_phase(planning)
+
+            def on_planned(plan_text: str) -> None:
+                # Step 2: Reviewer (tool calls will appear live in sidebar)
+                show_phase("🔎 **Reviewer Agent** is validating the plan with live searches… "
+                           "`▓▓▓▓▓▓░░░░` 60%", plan_text)
+
+            result = ctx.run(
+                asyncio.run,
+                pipeline(user_input, on_planned=on_planned,
+                         on_plan_delta=lambda draft: show_phase(planning, draft)),
+            )
+
+            # Completed: a toast instead of a blocking pause before rendering
+            if result.condensed:
+                st.toast("Validation complete", icon="✅")
+                # Condensed review: the Reviewer only returned fixes for the full plan
+                delta_list = parse_condensed_review(result.review_text)
+                validated_itinerary = result.plan_text
+                heading = ("### ✅ Reviewed Itinerary (apply the changes above)" if delta_list
+                           else "### ✅ Validated Itinerary")
+            elif result.reviewed:
+                st.toast("Validation complete", icon="✅")
+                # Parse reviewer output to extract Delta List and Validated Itinerary
+                delta_list, validated_itinerary = parse_reviewer_output(result.review_text)
+                heading = "### ✅ Validated Itinerary"
+            else:
+                st.toast("Itinerary ready: no prices or times to fact-check", icon="ℹ️")
+                delta_list, validated_itinerary = None, result.plan_text
+                heading = "### 🧭 Itinerary (not fact-checked)"
             
             # Clear the progress indicators
-            live_msg.empty()
-            progress.empty()
-
-            # Display Delta List if present
-            if delta_list:
-                st.markdown("### 🔍 Changes Made (Delta List)")
-                st.markdown(f'<div class="delta-list">{delta_list}</div>', unsafe_allow_html=True)
-                st.divider()
-            
-            # Display Validated Itinerary
-            st.markdown("### ✅ Validated Itinerary")
-            st.markdown(f'<div class="validated-itinerary">{validated_itinerary}</div>', unsafe_allow_html=True)
-            
-            # Expandable sections for more details
-            with st.expander("📋 See Original Plan from Planner Agent"):
-                st.markdown(plan_text)
+            status_slot.empty()
+
+            # Display Delta List (if present) and the itinerary
+            itinerary_html = build_itinerary_html(delta_list, validated_itinerary, heading)
+            st.markdown(itinerary_html, unsafe_allow_html=True)
             
-            with st.expander("🔍 See Full Reviewer Output"):
-                st.markdown(review_text)
+            # Raw agent outputs, rendered only when the user asks for them
+            st.session_state["_last_plan"] = {"plan": result.plan_text, "review": result.review_text}
+            st.session_state["_show_full"] = False
+            render_full_outputs()
 
             # Save to history with delta list info
             st.session_state.messages.append({
                 "role": "assistant", 
                 "content": validated_itinerary,
-                "delta_list": delta_list
+                "delta_list": delta_list,
+                "_html": itinerary_html,
             })
-            st.session_state.meta.append({"trace": "Planner Agent → Reviewer Agent"})
-            st.caption("✅ Validated by Reviewer Agent with real-time fact-checking")
+            if result.reviewed:
+                st.session_state.meta.append({"trace": "Planner Agent → Reviewer Agent"})
+                st.caption("✅ Validated by Reviewer Agent with real-time fact-checking")
+            else:
+                st.session_state.meta.append({"trace": "Planner Agent (no prices or times to check)"})
+                st.caption("ℹ️ No prices or times to fact-check, so the review was skipped")
 
         except Exception as e:
             # Friendly error box
-            live_msg.markdown("❌ Something went wrong.")
+            status_slot.markdown("❌ Something went wrong.")
             err = f"⚠️ Error while processing your request:\n\n```\n{e}\n```"
             st.markdown(err)
             st.session_state.messages.append({"role": "assistant", "content": err})
             st.session_state.meta.append({"trace": "Runtime error."})
 
         finally:
-            # Always remove the logger so it doesn't leak into the next request
-            set_tool_logger(None)
+            # Final flush so events that landed inside the debounce window are shown
+            flush_tool_log()
+            show_cache_stats()
@@ -0,0 +1,164 @@
+# llm_cache.py
+"""
+Prompt cache for agent runs.
+
+Highlights:
+- Key = sha256(model + instructions + input text), so any prompt change is a miss
+- In-memory LRU by default, optional on-disk shelve backend (LLM_CACHE_PATH)
+- Agents with an explicit temperature > 0 are never cached; an unset temperature
+  (provider default) is treated as cacheable
+- Runs where a tool reported a failure (mark_uncacheable) are not stored
+- Lives in its own module so it survives Streamlit reruns of the app script
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple
+
+DEFAULT_TTL = 3600  # seconds
+
+
+class CacheBackend(Protocol):
+    """Minimal key/value store with per-entry expiry."""
+
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        ...
+
+
+class MemoryBackend:
+    """Thread-safe LRU dict; the oldest entry is evicted once maxsize is reached."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class ShelveBackend:
+    """On-disk store so cached answers survive app restarts."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock, shelve.open(self.path) as db:
+            entry = db.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            # Wall-clock time here: monotonic time resets between processes
+            if expires_at is not None and expires_at < time.time():
+                del db[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock, shelve.open(self.path) as db:
+            db[key] = (expires_at, value)
+
+
+def _default_backend() -> CacheBackend:
+    path = os.getenv("LLM_CACHE_PATH")
+    return ShelveBackend(path) if path else MemoryBackend()
+
+
+BACKEND: CacheBackend = _default_backend()
+STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+
+# State of the cached run in progress. It holds a mutable dict rather than a flag:
+# tools run in child tasks with copied contexts, and only a shared object lets
+# their updates reach the wrapper that decides whether to store the result.
+_RUN_STATE: ContextVar[Optional[Dict[str, bool]]] = ContextVar("llm_cache_run", default=None)
+
+
+def mark_uncacheable() -> None:
+    """Keep the current cached run's result out of the cache (e.g. a tool failed)."""
+    state = _RUN_STATE.get()
+    if state is not None:
+        state["uncacheable"] = True
+
+
+def cache_key(agent: Any, input_text: str) -> Optional[str]:
+    """
+    Hash everything that determines the agent's answer.
+    Returns None when the agent explicitly samples with temperature > 0.
+    An unset temperature is cacheable on purpose: the provider default is not
+    deterministic either, but serving a repeated prompt its previous answer is
+    exactly what this cache is for. Set temperature > 0 on an agent to opt out.
+    """
+    settings = getattr(agent, "model_settings", None)
+    temperature = getattr(settings, "temperature", None)
+    if temperature is not None and temperature > 0:
+        return None
+    payload = {
+        "model": str(getattr(agent, "model", "")),
+        "instructions": str(getattr(agent, "instructions", "")),
+        "input": input_text,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def cached_run(agent: Any, ttl: float = DEFAULT_TTL) -> Callable[[Callable[..., Awaitable[str]]], Callable[..., Awaitable[str]]]:
+    """
+    Decorate `async fn(input_text, **kwargs) -> str` so repeated inputs to `agent`
+    skip the model call. Extra kwargs (e.g. UI callbacks) are not part of the key.
+    Results of runs that called mark_uncacheable() are returned but not stored.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+        @functools.wraps(fn)
+        async def wrapper(input_text: str, **kwargs: Any) -> str:
+            key = cache_key(agent, input_text)
+            if key is not None:
+                hit = BACKEND.get(key)
+                if hit is not None:
+                    STATS["hits"] += 1
+                    return hit
+            STATS["misses"] += 1
+            state = {"uncacheable": False}
+            token = _RUN_STATE.set(state)
+            try:
+                text = await fn(input_text, **kwargs)
+            finally:
+                _RUN_STATE.reset(token)
+            if key is not None and not state["uncacheable"]:
+                BACKEND.set(key, text, ttl=ttl)
+            return text
+
+        return wrapper
+
+    return decorator
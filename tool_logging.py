@@ -0,0 +1,83 @@
+# tool_logging.py
+"""
+Tool activity logging.
+
+Highlights:
+- Request-local logger (ContextVar) the UI installs and tools report to
+- Redaction with one precompiled regex per check, no .lower() copies
+- Memoized per string / per dict key name (queries and payload keys repeat a lot)
+- Lives in its own module so the logger var and memos survive Streamlit reruns
+"""
+
+from __future__ import annotations
+
+import re
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+# Tool call logger: the UI sets this per request. The tool checks it and logs.
+# A ContextVar keeps each request (and its async tasks) on its own logger,
+# so concurrent Streamlit sessions never see each other's events.
+TOOL_LOGGER: ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = ContextVar("tool_logger", default=None)
+
+
+def set_tool_logger(logger: Optional[Callable[[Dict[str, Any]], None]]) -> Token:
+    """Install or remove the UI logger used by tools to report activity."""
+    return TOOL_LOGGER.set(logger)
+
+
+def log_tool_event(event: Dict[str, Any]) -> None:
+    """If a logger is installed, send the event to the UI."""
+    cb = TOOL_LOGGER.get()
+    if cb is not None:
+        try:
+            cb(event)
+        except Exception:
+            # Logging should never break the app or the tool itself
+            pass
+
+
+def preview(s: str, n: int = 400) -> str:
+    """Bounded log preview with a single slice."""
+    return s if len(s) <= n else s[:n - 1] + "…"
+
+
+# Precompiled so each check is one case-insensitive scan (no .lower() copy)
+_SECRET_RE = re.compile(r"(api[_-]?key|token|secret|password)", re.I)
+_SECRET_KEY_RE = re.compile(r"(key|token|secret|password)", re.I)
+_SECRET_KEY_NAMES: Dict[str, bool] = {}  # dict key name -> should redact
+
+
+@lru_cache(maxsize=1024)
+def _redact_str(value: str) -> str:
+    """String branch of redact_for_logs for short strings."""
+    if _SECRET_RE.search(value):
+        return "[redacted]"
+    return value
+
+
+def _is_secret_key(name: str) -> bool:
+    """Cached per key name: payloads reuse the same handful of keys."""
+    hit = _SECRET_KEY_NAMES.get(name)
+    if hit is None:
+        hit = _SECRET_KEY_NAMES[name] = bool(_SECRET_KEY_RE.search(name))
+    return hit
+
+
+def redact_for_logs(value: Any) -> Any:
+    """
+    Make sure we don't leak secrets and keep logs small.
+    This is deliberately simple for teaching.
+    """
+    if isinstance(value, str):
+        # Only short strings go through the cache; long ones would just pin memory
+        if len(value) <= 300:
+            return _redact_str(value)
+        return "[redacted]" if _SECRET_RE.search(value) else value[:120] + "… [truncated]"
+    if isinstance(value, dict):
+        return {k: ("[redacted]" if _is_secret_key(k) else redact_for_logs(v))
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact_for_logs(v) for v in value]
+    return value
@@ -0,0 +1,272 @@
+# travel_agents.py
+"""
+Tools and agents for the travel planner.
+
+Highlights:
+- internet_search tool (Tavily REST API) on one pooled HTTP client per pipeline run,
+  plus a 10-minute result cache
+- Planner and Reviewer agent definitions
+- Imported by the app rather than defined in it: the app script is re-executed
+  on every Streamlit rerun, while this module (and the agents, tool schemas and
+  caches in it) is built once. Streamlit re-imports it when the file changes.
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+import llm_cache
+from tool_logging import log_tool_event, preview, redact_for_logs
+
+# These come from your own framework. We assume:
+# - Agent: defines a model + instructions + optional tools
+# - function_tool: exposes a Python function to an agent as a tool
+from agents import Agent, function_tool  # type: ignore
+
+load_dotenv()  # Loads variables from a local .env if present
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Tools
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Read once at import; .env is only re-read when Tavily rejects (or lacks) the key
+_TAVILY_KEY: Optional[str] = os.environ.get("TAVILY_API_KEY")
+
+
+def _reload_tavily_key() -> Optional[str]:
+    """Re-read .env (the key may have been added or rotated) and refresh the cached key."""
+    global _TAVILY_KEY
+    load_dotenv(override=True)
+    _TAVILY_KEY = os.environ.get("TAVILY_API_KEY")
+    return _TAVILY_KEY
+
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# HTTP client shared by every search in the current pipeline run, so they reuse
+# keep-alive connections. It lives per run rather than per process because its
+# connection pool is bound to the event loop of that run's asyncio.run.
+HTTP_CLIENT: ContextVar[Optional[httpx.AsyncClient]] = ContextVar("http_client", default=None)
+
+
+@asynccontextmanager
+async def search_session() -> AsyncIterator[httpx.AsyncClient]:
+    """Open the client searches in this run share; it is closed when the run ends."""
+    async with httpx.AsyncClient(timeout=30) as client:
+        token = HTTP_CLIENT.set(client)
+        try:
+            yield client
+        finally:
+            HTTP_CLIENT.reset(token)
+
+
+async def _tavily_search(api_key: str, query: str) -> Dict[str, Any]:
+    """POST one query to Tavily; non-2xx responses raise (401 reads "Unauthorized")."""
+    client = HTTP_CLIENT.get()
+    if client is None:
+        # Called outside search_session() (e.g. directly): use a one-off client
+        async with search_session():
+            return await _tavily_search(api_key, query)
+    resp = await client.post(
+        TAVILY_SEARCH_URL,
+        json={"query": query, "max_results": 3},
+        headers={"Authorization": f"Bearer {api_key}"},
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+# Recent search results by normalized query; the Reviewer re-asks the same facts a lot
+_SEARCH_CACHE = llm_cache.MemoryBackend(maxsize=512)
+SEARCH_TTL = 600  # seconds
+
+
+def _format_item(it: Dict[str, Any]) -> str:
+    """One search hit as a bullet; missing or empty fields read N/A."""
+    return f"- {it.get('title') or 'N/A'}: {it.get('content') or 'N/A'}"
+
+
+def _is_auth_error(e: Exception) -> bool:
+    """Bad keys surface as a 401 Unauthorized (or an "API key" message)."""
+    msg = str(e)
+    return "API key" in msg or "Unauthorized" in msg
+
+
+@function_tool
+async def internet_search(query: str) -> str:
+    """
+    Internet search backed by Tavily.
+    - Reads TAVILY_API_KEY once; reloads .env only on a missing or rejected key.
+    - Async, so the Runner can await several searches from one turn concurrently.
+    - Identical queries within SEARCH_TTL are answered from a shared cache.
+    - Failures keep the surrounding Reviewer run out of the prompt cache.
+    - Sends simple log events before/after the call so the UI can show activity.
+    """
+    log_tool_event({"type": "call", "tool": "internet_search", "args": {"query": redact_for_logs(query)}})
+
+    try:
+        cache_key = " ".join(query.lower().split())
+        cached = _SEARCH_CACHE.get(cache_key)
+        if cached is not None:
+            log_tool_event({
+                "type": "result",
+                "tool": "internet_search",
+                "cached": True,
+                "preview": preview(cached),
+            })
+            return cached
+
+        api_key = _TAVILY_KEY or _reload_tavily_key()
+        if not api_key:
+            msg = "missing TAVILY_API_KEY in environment."
+            log_tool_event({"type": "error", "tool": "internet_search", "error": msg})
+            llm_cache.mark_uncacheable()  # a review without searches must not be reused
+            return f"Search error: {msg}"
+
+        try:
+            response = await _tavily_search(api_key, query)
+        except Exception as e:
+            new_key = _reload_tavily_key() if _is_auth_error(e) else None
+            if not new_key or new_key == api_key:
+                raise
+            # The key changed in .env: retry once with the new key
+            response = await _tavily_search(new_key, query)
+
+        items = response.get("results") or []
+        output = "\n".join(map(_format_item, items)) if items else "No results found."
+
+        log_tool_event({
+            "type": "result",
+            "tool": "internet_search",
+            # Search results are already bounded and carry no secrets: no redaction pass
+            "preview": preview(output),
+        })
+        _SEARCH_CACHE.set(cache_key, output, ttl=SEARCH_TTL)
+        return output
+
+    except Exception as e:
+        error_msg = str(e)
+        log_tool_event({"type": "error", "tool": "internet_search", "error": error_msg})
+        llm_cache.mark_uncacheable()  # a review built on a failed search must not be reused
+        # Provide more helpful error message
+        if _is_auth_error(e):
+            return f"Search error: Invalid Tavily API key. Please check your TAVILY_API_KEY in the .env file. Error: {error_msg}"
+        return f"Search error: {error_msg}"
+
+    finally:
+        log_tool_event({"type": "end", "tool": "internet_search"})
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Agents
+# ──────────────────────────────────────────────────────────────────────────────
+
+# BEGIN SOLUTION
+REVIEWER_INSTRUCTIONS = """
+You are a Travel Plan Reviewer Agent. Your role is to review and validate travel itineraries created by a Planner Agent before they are shown to the user.
+
+Your primary responsibilities:
+1. Feasibility Check: Verify that activities are realistic and feasible
+   - Check opening hours of museums, attractions, restaurants
+   - Verify ticket prices and availability
+   - Validate travel times between locations
+   - Ensure activities can actually be completed in the allocated time
+
+2. Identify Issues: Find unrealistic or conflicting activities
+   - Activities scheduled during closed hours
+   - Unrealistic travel times or distances
+   - Budget overruns or incorrect price estimates
+   - Conflicting activities (e.g., two places at the same time)
+   - Missing essential information (transportation, meals, etc.)
+
+3. Use Internet Search: Use the internet_search tool for real-time fact-checking
+   - Verify current ticket prices and availability
+   - Check opening hours and days of operation
+   - Validate travel times and distances between locations
+   - Confirm current information about attractions, restaurants, etc.
+
+4. Create Delta List: For any issues found, create a "Delta List" with:
+   - Specific changes needed (what to change)
+   - Clear reasons for each change (why it's needed)
+   - Concrete fixes or corrections
+
+Your output format:
+1. Delta List (if issues found):
+   - List each issue as: "[Issue]: [Reason] → [Fix]"
+   - Be specific and actionable
+   - Example: "Louvre visit at 8 PM: Museum closes at 6 PM → Move to 2 PM"
+
+2. Validated Itinerary:
+   - If issues were found, provide the corrected itinerary else confirm the plan is valid
+   - Maintain the same clear, structured format as the original
+   - Include brief notes on what was verified via internet search
+
+Long itineraries may arrive condensed: a one-line summary followed by a JSON object that maps each section (e.g. a day) to its lines with prices, times or durations. In that case, fact-check those claims and output only the Delta List (write "No issues found." if there are none). Do not write a Validated Itinerary: the user keeps the full original plan and applies your fixes to it.
+
+Be thorough and use internet search liberally to ensure accuracy. Your goal is to catch errors before the user sees the plan.
+"""
+
+PLANNER_INSTRUCTIONS = """
+You are a Travel Planner Agent. Your role is to transform a user's travel prompt into a detailed, day-by-day itinerary.
+
+Your task:
+Take a vague travel prompt (e.g., "Plan a week-long Europe trip for a student on a $1,500 budget who loves history and food, traveling with a friend who enjoys art and nightlife") and expand it into a comprehensive travel plan that considers all travelers' interests.
+
+Requirements for your itinerary:
+
+1. Day-by-Day Structure: 
+   - Organize activities by day
+   - Include approximate times for each activity
+   - Specify locations clearly
+
+2. Essential Components:
+   - Day-by-day activities with approximate times and locations
+   - Estimated costs for each major expense (accommodations, activities, meals, transportation)
+   - City clusters (group activities by geographic proximity)
+   - Logistics (transportation between cities/locations, check-in/check-out times)
+
+3. User Constraints:
+   - Respect the stated budget (break down costs and ensure total stays within budget)
+   - Honor specific dates or duration mentioned
+   - Incorporate user interests: Identify and include activities that match the user's stated interests (e.g., history, food, art, nature, adventure, shopping, nightlife)
+   - Consider companions' interests: If the user mentions traveling with companions (family, friends, partner, children, etc.), identify their interests and preferences, and create a balanced itinerary that accommodates both the user's and companions' interests
+   - Balance activities to ensure everyone in the travel group has engaging experiences
+   - Match the pacing preference (relaxed, moderate, or fast-paced)
+
+4. Format:
+   - Present the plan in a clear, structured format that's easy to read
+   - Use headings, bullet points, and clear sections
+   - Include a summary with total estimated costs
+   - Make it visually organized and scannable
+
+Important constraints:
+- No internet acces*: You work entirely from your own knowledge
+- Be realistic with time estimates and travel logistics
+- Consider practical factors like meal times, rest, and travel between locations
+- Provide a balanced mix of activities that match both the user's and any companions' interests
+- When companions are mentioned, ensure the itinerary includes activities that appeal to different interests within the group
+- If interests conflict, find creative ways to balance them (e.g., morning activity for one interest, afternoon for another, or activities that combine multiple interests)
+
+Your output should be a complete, ready-to-use travel itinerary that a user could follow.
+"""
+
+reviewer_agent = Agent(
+    name="Reviewer Agent",
+    model="openai.gpt-4o",
+    instructions=REVIEWER_INSTRUCTIONS.strip(),
+    tools=[internet_search]
+)
+
+planner_agent = Agent(
+    name="Planner Agent",
+    model="openai.gpt-4o",
+    instructions=PLANNER_INSTRUCTIONS.strip(),
+)
+
+# END SOLUTION